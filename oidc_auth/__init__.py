@@ -8,6 +8,6 @@ Designed for developers building multiple microservices, offering a drop-in
 authentication solution to avoid code duplication.
 """
 
-from .session import SessionStorage, InMemorySessionStore
+from .session import AsyncSessionStorage, SessionStorage, InMemorySessionStore
 from .middleware import OIDCAuthMiddleware
-from .types import OIDCSettings
+from .types import FrozenOIDCSettings, OIDCSettings, freeze_settings
@@ -1,12 +1,26 @@
-from typing import Dict, Optional
-import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
+import asyncio
+import secrets
+import time
 
 import httpx
+import jwt
+import orjson
+from cachetools import TLRUCache, TTLCache
 from fastapi import Request
 from fastapi.responses import RedirectResponse, JSONResponse
 
-from oidc_auth.types import OIDCSettings
-from oidc_auth.session import SessionStorage
+from oidc_auth.discovery import DiscoveryCache
+from oidc_auth.types import FrozenOIDCSettings, OIDCSettings, StoredSession
+from oidc_auth.session import AsyncSessionStorage, SessionStorage
+
+# Access tokens with less than this many seconds left are refreshed in the background.
+REFRESH_MARGIN = 60
+# Exchanged tokens are reused for at most this long, and never closer than
+# EXCHANGE_EXPIRY_MARGIN seconds to their own expiry.
+EXCHANGE_CACHE_TTL = 55
+EXCHANGE_EXPIRY_MARGIN = 5
 
 # --- 1. The Controller (Shared Logic) ---
 class OIDCController:
@@ -19,27 +33,130 @@ class OIDCController:
     to promote reusability across various Python web applications.
 
     Attributes:
-        config (OIDCSettings): An instance of OIDCSettings containing OIDC
-                               client configuration, including client_id,
+        config (Union[OIDCSettings, FrozenOIDCSettings]): The OIDC client
+                               configuration, including client_id,
                                client_secret, authorize_url, token_url,
                                userinfo_url, scope, and redirect_uri.
-        session_store (SessionStorage): An object that implements the SessionStorage
-                                        protocol for storing session data.
+        session_store (Union[SessionStorage, AsyncSessionStorage]): An object that
+                                        implements the SessionStorage or
+                                        AsyncSessionStorage interface for storing
+                                        session data.
     """
-    def __init__(self, config: OIDCSettings, session_store: SessionStorage):
+    def __init__(
+        self,
+        config: Union[OIDCSettings, FrozenOIDCSettings],
+        session_store: Union[SessionStorage, AsyncSessionStorage],
+    ):
         """
         Initializes the OIDCController with configuration and session storage.
 
         Args:
-            config (OIDCSettings): An instance of OIDCSettings containing OIDC
-                                   client configuration (e.g., CLIENT_ID,
-                                   CLIENT_SECRET, AUTHORIZE_URL, etc.).
-            session_store (SessionStorage): An object adhering to the
-                                            SessionStorage protocol for
+            config (Union[OIDCSettings, FrozenOIDCSettings]): An instance of
+                                   OIDCSettings containing OIDC client
+                                   configuration (e.g., CLIENT_ID, CLIENT_SECRET,
+                                   AUTHORIZE_URL, etc.), or its `freeze_settings`
+                                   snapshot.
+            session_store (Union[SessionStorage, AsyncSessionStorage]): An object
+                                            adhering to the SessionStorage or
+                                            AsyncSessionStorage interface for
                                             persisting session data.
         """
         self.config = config
         self.session_store = session_store
+        # A single pooled client is shared across requests so connections to the
+        # IdP are kept alive instead of re-handshaking on every login/exchange.
+        # HTTP/2 lets the token and userinfo calls multiplex over one connection.
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+            timeout=httpx.Timeout(5.0, connect=2.0),
+        )
+        # UserInfo responses keyed by the id_token's `sid` (falling back to `sub`),
+        # so re-logins of the same subject skip the userinfo round trip.
+        self._userinfo_cache: TTLCache = TTLCache(maxsize=10_000, ttl=1800)
+        # Discovery document and signing keys used to validate id_tokens offline.
+        self._discovery = DiscoveryCache()
+        # Everything in the authorize URL except `state` is fixed configuration.
+        static_params = urlencode(
+            {
+                "client_id": config.CLIENT_ID,
+                "response_type": "code",
+                "scope": config.SCOPE,
+                "redirect_uri": config.REDIRECT_URI,
+            },
+            quote_via=quote,
+        )
+        self._authorize_prefix = f"{config.AUTHORIZE_URL}?{static_params}&state="
+        # The session cookie's attributes never change, so the Set-Cookie header
+        # is assembled directly instead of going through SimpleCookie per login.
+        self._cookie_suffix = (
+            f"; HttpOnly; Path=/; SameSite={config.COOKIE_SAMESITE}"
+            f"{'; Secure' if config.COOKIE_SECURE else ''}"
+        )
+        # Exchanged tokens per (session_id, target_client), stored as
+        # (token, lifetime) so each entry expires with the token it holds.
+        self._exchange_cache: TLRUCache = TLRUCache(
+            maxsize=10_000, ttu=lambda _key, value, now: now + value[1]
+        )
+        # Exchanges in flight per key, so concurrent requests for the same exchange
+        # only hit the IdP once. Entries are removed as soon as the exchange ends.
+        self._exchange_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        # In-flight refresh tasks per session, so each session refreshes at most once
+        # at a time (this also keeps the tasks referenced until they finish).
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    async def aclose(self) -> None:
+        """
+        Cancels in-flight refreshes and exchanges, then closes the shared HTTP
+        client and releases its pooled connections.
+
+        Should be called once when the consuming application shuts down.
+        """
+        tasks = [*self._refresh_tasks.values(), *self._exchange_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    def invalidate(self, sid: str) -> None:
+        """
+        Drops the cached user information for an IdP session.
+
+        Args:
+            sid (str): The `sid` (or `sub`) claim the user information was cached under.
+        """
+        self._userinfo_cache.pop(sid, None)
+
+    async def get_session(self, session_id: str) -> Optional[StoredSession]:
+        """
+        Looks up a session in the session store, whether it is sync or async.
+
+        Args:
+            session_id (str): The session ID from the user's cookie.
+
+        Returns:
+            Optional[StoredSession]: The session, or None if it does not exist.
+        """
+        if isinstance(self.session_store, AsyncSessionStorage):
+            return await self.session_store.get(session_id)
+        return self.session_store.get(session_id)
+
+    async def _save_session(self, session_id: str, session: StoredSession) -> None:
+        """
+        Writes a session to the session store, whether it is sync or async.
+        """
+        if isinstance(self.session_store, AsyncSessionStorage):
+            await self.session_store.set(session_id, session)
+        else:
+            self.session_store[session_id] = session
+
+    async def _pop_session(self, session_id: str) -> Optional[StoredSession]:
+        """
+        Removes and returns a session from the session store, whether it is sync or async.
+        """
+        if isinstance(self.session_store, AsyncSessionStorage):
+            return await self.session_store.pop(session_id)
+        return self.session_store.pop(session_id, None)
 
     async def login(self, request: Request):
         """
@@ -56,15 +173,7 @@ class OIDCController:
             RedirectResponse: A response that redirects the user's browser
                               to the OIDC provider for authentication.
         """
-        params = {
-            "client_id": self.config.CLIENT_ID,
-            "response_type": "code",
-            "scope": self.config.SCOPE,
-            "redirect_uri": self.config.REDIRECT_URI,
-            "state": str(uuid.uuid4()),
-        }
-        query = "&".join([f"{k}={v}" for k, v in params.items()])
-        return RedirectResponse(f"{self.config.AUTHORIZE_URL}?{query}")
+        return RedirectResponse(self._authorize_prefix + secrets.token_urlsafe(32))
 
     async def callback(self, request: Request):
         """
@@ -72,16 +181,18 @@ class OIDCController:
 
         Upon successful authentication, the OIDC provider redirects the user
         back to this endpoint with an authorization code. This method
-        exchanges the code for access and ID tokens, fetches user information
-        using the access token, and stores relevant user and token data in the
+        exchanges the code for access and ID tokens, validates the ID token
+        against the provider's signing keys, takes the user information from
+        its claims, and stores relevant user and token data in the
         session store. It then redirects the user to the application's root.
 
         Args:
             request (Request): The incoming FastAPI/Starlette request object.
 
         Returns:
-            JSONResponse: An error response if the code is missing or token
-                          exchange fails.
+            JSONResponse: An error response if the code is missing, token
+                          exchange fails, the ID token is missing or invalid,
+                          or user information cannot be fetched.
             RedirectResponse: A response that redirects the user to the
                               application's root page after successful login
                               and sets a session cookie.
@@ -90,54 +201,109 @@ class OIDCController:
         if not code:
             return JSONResponse({"error": "Missing code"}, status_code=400)
 
-        async with httpx.AsyncClient() as client:
-            token_resp = await client.post(
-                self.config.TOKEN_URL,
-                data={
-                    "client_id": self.config.CLIENT_ID,
-                    "client_secret": self.config.CLIENT_SECRET,
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": self.config.REDIRECT_URI,
-                },
-                headers={"Accept": "application/json"}
-            )
-            
-            if token_resp.status_code != 200:
-                return JSONResponse({"error": "Failed to get token"}, status_code=400)
-            
-            tokens = token_resp.json()
-            access_token = tokens.get("access_token")
+        token_resp = await self._client.post(
+            self.config.TOKEN_URL,
+            data={
+                "client_id": self.config.CLIENT_ID,
+                "client_secret": self.config.CLIENT_SECRET,
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": self.config.REDIRECT_URI,
+            },
+            headers={"Accept": "application/json"}
+        )
+        
+        if token_resp.status_code != 200:
+            return JSONResponse({"error": "Failed to get token"}, status_code=400)
+        
+        tokens = orjson.loads(token_resp.content)
+        access_token = tokens.get("access_token")
+
+        id_token = tokens.get("id_token")
+        if not id_token:
+            return JSONResponse({"error": "Missing id_token"}, status_code=400)
+        try:
+            claims = await self._verify_id_token(id_token)
+        except jwt.PyJWTError:
+            return JSONResponse({"error": "Invalid id_token"}, status_code=400)
+        except httpx.HTTPError:
+            return JSONResponse({"error": "Failed to get signing keys"}, status_code=502)
+        sid = claims.get("sid") or claims.get("sub")
 
-            user_resp = await client.get(
+        # The verified id_token claims are used as the user information. The
+        # userinfo endpoint is only consulted when the IdP leaves profile claims
+        # out of the id_token.
+        user_info = claims if "email" in claims else self._userinfo_cache.get(sid)
+        if user_info is None:
+            user_resp = await self._client.get(
                 self.config.USERINFO_URL,
                 headers={"Authorization": f"Bearer {access_token}"}
             )
-            user_info = user_resp.json()
-
-            # Persistence
-            session_id = str(uuid.uuid4())
-            self.session_store[session_id] = {
-                "user": user_info,
-                "access_token": access_token
-            }
-            
-            response = RedirectResponse(url="/")
-            response.set_cookie(
-                key="session_id", 
-                value=session_id, 
-                httponly=True, 
-                secure=self.config.COOKIE_SECURE, 
-                samesite=self.config.COOKIE_SAMESITE
+            if user_resp.status_code != 200:
+                return JSONResponse({"error": "Failed to get user info"}, status_code=400)
+            user_info = orjson.loads(user_resp.content)
+            if sid:
+                self._userinfo_cache[sid] = user_info
+
+        # Persistence
+        session_id = secrets.token_urlsafe(32)
+        await self._save_session(session_id, StoredSession(
+            user=user_info,
+            access_token=access_token,
+            refresh_token=tokens.get("refresh_token"),
+            id_token=id_token,
+            sid=sid,
+            expires_at=_expires_at(tokens),
+        ))
+        
+        response = RedirectResponse(url="/")
+        response.raw_headers.append(
+            (b"set-cookie", f"session_id={session_id}{self._cookie_suffix}".encode("latin-1"))
+        )
+        return response
+
+    async def _verify_id_token(self, id_token: str) -> Dict:
+        """
+        Validates an id_token against the IdP's signing keys and returns its claims.
+
+        Args:
+            id_token (str): The encoded id_token returned by the token endpoint.
+
+        Returns:
+            Dict: The verified id_token claims.
+
+        Raises:
+            jwt.PyJWTError: If the signature, audience, issuer or expiry is invalid,
+                            or no signing key matches the token.
+            httpx.HTTPError: If the signing keys cannot be fetched.
+        """
+        kid = jwt.get_unverified_header(id_token).get("kid")
+        signing_key = None
+        # An unknown key ID may mean the IdP rotated its keys, so revalidate once.
+        for force in (False, True):
+            jwks = await self._discovery.get_jwks(
+                self._client, self.config.ISSUER_URL, self.config.JWKS_URL, force=force
             )
-            return response
+            signing_key = next((k for k in jwks.keys if k.key_id == kid), None)
+            if signing_key is not None:
+                break
+        if signing_key is None:
+            raise jwt.InvalidTokenError(f"No signing key found for kid {kid!r}")
+        return jwt.decode(
+            id_token,
+            key=signing_key.key,
+            algorithms=["RS256"],
+            audience=self.config.CLIENT_ID,
+            issuer=self.config.ISSUER_URL,
+        )
 
     async def logout(self, request: Request):
         """
         Handles user logout.
 
         Invalidates the user's session by removing their data from the
-        session store and clears the session cookie from the user's browser.
+        session store, drops any cached user information for it, and clears
+        the session cookie from the user's browser.
         After logout, the user is redirected to the login page.
 
         Args:
@@ -149,8 +315,9 @@ class OIDCController:
                               the session cookie.
         """
         session_id = request.cookies.get("session_id")
-        if session_id and session_id in self.session_store:
-            del self.session_store[session_id]
+        session = await self._pop_session(session_id) if session_id else None
+        if session is not None and session.sid:
+            self.invalidate(session.sid)
             
         response = RedirectResponse(url="/login")
         response.delete_cookie("session_id")
@@ -165,6 +332,12 @@ class OIDCController:
         This is useful for service-to-service calls where the downstream service
         needs to verify the original user's identity.
 
+        Exchanged tokens are cached briefly per session and target, and
+        concurrent calls for the same pair share a single request to the IdP.
+        When the session's access token is about to expire, it is refreshed in
+        the background while the still-valid token is used for this call; an
+        already expired token is refreshed before exchanging.
+
         Note: This requires the OIDC provider to support the token exchange
         grant type (RFC 8693).
 
@@ -178,30 +351,244 @@ class OIDCController:
             Optional[str]: The newly obtained access token if the exchange is
                            successful, otherwise None.
         """
-        if session_id not in self.session_store:
+        session = await self.get_session(session_id)
+        if session is None:
             return None
 
-        subject_token = self.session_store[session_id].get("access_token")
+        if session.expires_at is not None and session.refresh_token:
+            remaining = session.expires_at - time.time()
+            if remaining <= 0:
+                # Shielded so a cancelled request does not cancel the shared refresh.
+                await asyncio.shield(self._schedule_refresh(session_id))
+                session = await self.get_session(session_id)
+                if session is None:
+                    return None
+            elif remaining < REFRESH_MARGIN:
+                self._schedule_refresh(session_id)
+
+        subject_token = session.access_token
         if not subject_token:
             return None
 
-        async with httpx.AsyncClient() as client:
-            exchange_resp = await client.post(
+        key: Tuple[str, str] = (session_id, target_client)
+        cached = self._exchange_cache.get(key)
+        if cached is not None:
+            return cached[0]
+
+        task = self._exchange_tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._exchange_and_cache(key, subject_token))
+            self._exchange_tasks[key] = task
+            task.add_done_callback(lambda t: _forget_task(self._exchange_tasks, key, t))
+        # Shielded so one cancelled caller does not cancel the exchange for the others.
+        return await asyncio.shield(task)
+
+    async def _exchange_and_cache(self, key: Tuple[str, str], subject_token: str) -> Optional[str]:
+        """
+        Exchanges `subject_token` for the key's target and caches the result.
+
+        The token is cached for EXCHANGE_CACHE_TTL seconds, or less if the IdP
+        reports that it expires sooner.
+
+        Args:
+            key (Tuple[str, str]): The (session_id, target_client) cache key.
+            subject_token (str): The user's access token to exchange.
+
+        Returns:
+            Optional[str]: The exchanged access token, or None if the IdP refused
+                           the exchange or returned a malformed response.
+        """
+        new_tokens = await self._request_exchange(subject_token, key[1])
+        if new_tokens is None:
+            return None
+        token = new_tokens.get("access_token")
+        if not isinstance(token, str) or not token:
+            return None
+        lifetime: float = EXCHANGE_CACHE_TTL
+        expires_in = new_tokens.get("expires_in")
+        if expires_in is not None:
+            lifetime = min(lifetime, expires_in - EXCHANGE_EXPIRY_MARGIN)
+        if lifetime > 0:
+            self._exchange_cache[key] = (token, lifetime)
+        return token
+
+    async def batch_exchange_token(
+        self, pairs: Iterable[Tuple[str, str]], max_concurrency: int = 20
+    ) -> List[Optional[str]]:
+        """
+        Performs several token exchanges concurrently.
+
+        Each `(session_id, target_client)` pair goes through `exchange_token`,
+        so caching and deduplication still apply. At most `max_concurrency`
+        exchanges are in flight at once; over HTTP/2 they share one connection.
+
+        Args:
+            pairs (Iterable[Tuple[str, str]]): The (session_id, target_client)
+                                                pairs to exchange.
+            max_concurrency (int): The maximum number of concurrent exchanges.
+                                   Defaults to 20.
+
+        Returns:
+            List[Optional[str]]: The exchanged tokens, in the order of `pairs`,
+                                 with None for exchanges that failed, including
+                                 transport errors and malformed IdP responses.
+
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def exchange_one(session_id: str, target_client: str) -> Optional[str]:
+            async with semaphore:
+                # One failing exchange must not abort the rest of the batch.
+                try:
+                    return await self.exchange_token(session_id, target_client)
+                except httpx.HTTPError:
+                    return None
+
+        return await asyncio.gather(*(exchange_one(s, t) for s, t in pairs))
+
+    def _schedule_refresh(self, session_id: str) -> asyncio.Task:
+        """
+        Starts a background refresh of a session's tokens, unless one is running.
+
+        Args:
+            session_id (str): The ID of the session to refresh.
+
+        Returns:
+            asyncio.Task: The in-flight refresh task, which callers may await.
+        """
+        task = self._refresh_tasks.get(session_id)
+        if task is None:
+            task = asyncio.create_task(self._refresh_session(session_id))
+            self._refresh_tasks[session_id] = task
+            task.add_done_callback(lambda t: _forget_task(self._refresh_tasks, session_id, t))
+        return task
+
+    async def _refresh_session(self, session_id: str) -> None:
+        """
+        Uses the session's refresh token to obtain a new access token.
+
+        The session is updated in place and written back to the session store.
+        Failures leave the session untouched; the next request will retry.
+
+        Args:
+            session_id (str): The ID of the session to refresh.
+        """
+        session = await self.get_session(session_id)
+        if session is None or not session.refresh_token:
+            return
+
+        try:
+            refresh_resp = await self._client.post(
                 self.config.TOKEN_URL,
                 data={
-                    "grant_type": "urn:ietf:params:oauth:grant-type:token-exchange",
+                    "grant_type": "refresh_token",
                     "client_id": self.config.CLIENT_ID,
                     "client_secret": self.config.CLIENT_SECRET,
-                    "subject_token": subject_token,
-                    "subject_token_type": "urn:ietf:params:oauth:token-type:access_token",
-                    "audience": target_client,
+                    "refresh_token": session.refresh_token,
                 },
                 headers={"Accept": "application/json"}
             )
+        except httpx.HTTPError:
+            return
+        if refresh_resp.status_code != 200:
+            return
+
+        # A malformed body (not JSON, not an object, or a bad `expires_in`) is
+        # treated like any other failed refresh.
+        try:
+            tokens = orjson.loads(refresh_resp.content)
+            expires_at = _expires_at(tokens)
+        except (AttributeError, TypeError, ValueError):
+            return
+        session.access_token = tokens.get("access_token", session.access_token)
+        session.refresh_token = tokens.get("refresh_token", session.refresh_token)
+        session.expires_at = expires_at
+        # The user may have logged out while the request was in flight.
+        if await self.get_session(session_id) is not None:
+            await self._save_session(session_id, session)
+
+    async def _request_exchange(
+        self, subject_token: str, target_client: str
+    ) -> Optional[Dict]:
+        """
+        Sends the RFC 8693 token exchange request to the IdP.
+
+        Args:
+            subject_token (str): The user's access token to exchange.
+            target_client (str): The audience of the requested token.
 
-            if exchange_resp.status_code != 200:
-                # Optionally log the error from exchange_resp.json()
+        Returns:
+            Optional[Dict]: The decoded token response, with `expires_in` (if
+                            present) converted to a float, or None if the IdP
+                            refused the exchange or returned a malformed body.
+        """
+        exchange_resp = await self._client.post(
+            self.config.TOKEN_URL,
+            data={
+                "grant_type": "urn:ietf:params:oauth:grant-type:token-exchange",
+                "client_id": self.config.CLIENT_ID,
+                "client_secret": self.config.CLIENT_SECRET,
+                "subject_token": subject_token,
+                "subject_token_type": "urn:ietf:params:oauth:token-type:access_token",
+                "audience": target_client,
+            },
+            headers={"Accept": "application/json"}
+        )
+
+        if exchange_resp.status_code != 200:
+            # Optionally log the error from exchange_resp.json()
+            return None
+        
+        # A malformed body (not JSON, not an object, or a bad `expires_in`) is
+        # treated like a refused exchange, so it never fails the shared task.
+        try:
+            new_tokens = orjson.loads(exchange_resp.content)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(new_tokens, dict):
+            return None
+        expires_in = new_tokens.get("expires_in")
+        if expires_in is not None:
+            try:
+                new_tokens["expires_in"] = float(expires_in)
+            except (TypeError, ValueError):
                 return None
-            
-            new_tokens = exchange_resp.json()
-            return new_tokens.get("access_token")
+        return new_tokens
+
+
+def _expires_at(tokens: Dict) -> Optional[float]:
+    """
+    Converts a token response's `expires_in` into an absolute Unix timestamp.
+
+    Args:
+        tokens (Dict): The decoded token endpoint response.
+
+    Returns:
+        Optional[float]: The expiry time, or None if the IdP did not report one.
+    """
+    expires_in = tokens.get("expires_in")
+    if expires_in is None:
+        return None
+    return time.time() + float(expires_in)
+
+
+def _forget_task(tasks: Dict, key: Any, task: asyncio.Task) -> None:
+    """
+    Removes a finished task from its registry.
+
+    The task's exception is marked as retrieved, so a failure whose callers
+    have all gone away is not reported as "never retrieved".
+
+    Args:
+        tasks (Dict): The registry of in-flight tasks.
+        key (Any): The key the task is registered under.
+        task (asyncio.Task): The finished task.
+    """
+    if tasks.get(key) is task:
+        del tasks[key]
+    if not task.cancelled():
+        task.exception()
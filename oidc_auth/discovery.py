@@ -0,0 +1,181 @@
+"""
+OIDC Discovery and JWKS Caching
+
+This module fetches the IdP's `.well-known/openid-configuration` document and
+its JSON Web Key Set (JWKS), caching both so that token validation does not
+hit the network on every authentication.
+
+Cached documents are kept for an hour. Once they expire, they are revalidated
+with `If-None-Match` using the stored ETag; a `304 Not Modified` answer simply
+extends the lifetime of the already-parsed document.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+import jwt
+import orjson
+from cachetools import LRUCache, TTLCache
+
+
+class DiscoveryError(httpx.HTTPError):
+    """
+    Raised when the IdP answers with a discovery document or key set that cannot be used.
+
+    It subclasses `httpx.HTTPError` so callers handle it like a failed fetch.
+    """
+
+
+class DiscoveryCache:
+    """
+    A cache for the IdP's discovery document and signing keys.
+
+    Each `OIDCController` owns one instance, so caches are never shared between
+    controllers. Concurrent requests for the same document share a single fetch.
+    """
+    def __init__(self, maxsize: int = 16, ttl: float = 3600):
+        """
+        Initializes an empty discovery cache.
+
+        Args:
+            maxsize (int): The maximum number of cached documents. Defaults to 16.
+            ttl (float): How long a document is used before being revalidated,
+                         in seconds. Defaults to one hour.
+        """
+        # Fresh documents, keyed by URL.
+        self._documents: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Last (ETag, parsed document) seen per URL, kept past expiry for revalidation.
+        self._validators: LRUCache = LRUCache(maxsize=maxsize)
+        # Fetches currently in flight, keyed by URL.
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_openid_configuration(
+        self, client: httpx.AsyncClient, issuer: str
+    ) -> Dict[str, Any]:
+        """
+        Returns the IdP's OpenID Connect discovery document.
+
+        Args:
+            client (httpx.AsyncClient): The HTTP client used to reach the IdP.
+            issuer (str): The OIDC issuer URL.
+
+        Returns:
+            Dict[str, Any]: The decoded `.well-known/openid-configuration` document.
+
+        Raises:
+            httpx.HTTPError: If the document cannot be fetched or is not a JSON object.
+        """
+        url = f"{issuer.rstrip('/')}/.well-known/openid-configuration"
+        return await self._get(client, url, dict)
+
+    async def get_jwks(
+        self,
+        client: httpx.AsyncClient,
+        issuer: str,
+        jwks_url: Optional[str] = None,
+        force: bool = False,
+    ) -> jwt.PyJWKSet:
+        """
+        Returns the IdP's signing keys.
+
+        Args:
+            client (httpx.AsyncClient): The HTTP client used to reach the IdP.
+            issuer (str): The OIDC issuer URL, used to discover the JWKS endpoint.
+            jwks_url (str, optional): An explicit JWKS endpoint URL, skipping discovery.
+            force (bool): Revalidate with the IdP even if the cached keys are fresh,
+                          e.g. when a token references an unknown key ID.
+
+        Returns:
+            jwt.PyJWKSet: The parsed key set.
+
+        Raises:
+            httpx.HTTPError: If the keys cannot be fetched, or the IdP does not
+                             advertise a usable JWKS endpoint or key set.
+        """
+        if jwks_url is None:
+            config = await self.get_openid_configuration(client, issuer)
+            jwks_url = config.get("jwks_uri")
+            if not isinstance(jwks_url, str):
+                raise DiscoveryError("Discovery document has no jwks_uri")
+        return await self._get(client, jwks_url, jwt.PyJWKSet.from_dict, force)
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        parse: Callable[[Dict[str, Any]], Any],
+        force: bool = False,
+    ) -> Any:
+        """
+        Returns the cached document for `url`, fetching or revalidating it if needed.
+
+        A fetch already in flight for `url` is joined rather than duplicated.
+
+        Args:
+            client (httpx.AsyncClient): The HTTP client used to reach the IdP.
+            url (str): The document URL, also used as the cache key.
+            parse (Callable): Converts the decoded JSON body into the cached value.
+            force (bool): Revalidate with the IdP even if the cached copy is fresh.
+
+        Returns:
+            Any: The parsed document.
+
+        Raises:
+            httpx.HTTPError: If the document cannot be fetched or parsed.
+        """
+        if not force:
+            cached = self._documents.get(url)
+            if cached is not None:
+                return cached
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(client, url, parse))
+            self._inflight[url] = task
+            task.add_done_callback(lambda t: self._forget(url, t))
+        # Shielded so one cancelled caller does not cancel the fetch for the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, url: str, task: asyncio.Task) -> None:
+        """
+        Clears a finished fetch, marking its exception as retrieved if every caller left.
+        """
+        self._inflight.pop(url, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        parse: Callable[[Dict[str, Any]], Any],
+    ) -> Any:
+        """
+        Fetches `url` from the IdP, revalidating with the stored ETag if there is one.
+
+        Bodies that are not a JSON object, or that `parse` rejects, raise `DiscoveryError`.
+        """
+        headers = {"Accept": "application/json"}
+        validator: Optional[Tuple[str, Any]] = self._validators.get(url)
+        if validator:
+            headers["If-None-Match"] = validator[0]
+
+        resp = await client.get(url, headers=headers)
+        if resp.status_code == 304 and validator:
+            value = validator[1]
+        else:
+            resp.raise_for_status()
+            try:
+                document = orjson.loads(resp.content)
+                if not isinstance(document, dict):
+                    raise DiscoveryError(f"Expected a JSON object from {url}")
+                value = parse(document)
+            except (orjson.JSONDecodeError, jwt.PyJWKSetError) as exc:
+                raise DiscoveryError(f"Invalid document from {url}: {exc}") from exc
+            etag = resp.headers.get("ETag")
+            if etag:
+                self._validators[url] = (etag, value)
+
+        self._documents[url] = value
+        return value
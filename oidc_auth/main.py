@@ -6,38 +6,126 @@ into a FastAPI application. It sets up a basic FastAPI app with OIDC authenticat
 and defines protected and public routes.
 """
 
+import html
+import os
+import re
+import string
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Union
+
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from starlette.responses import RedirectResponse
 
 from oidc_auth.controller import OIDCController
 from oidc_auth.middleware import OIDCAuthMiddleware
-from oidc_auth.session import InMemorySessionStore
-from oidc_auth.types import OIDCSettings
+from oidc_auth.session import AsyncSessionStorage, InMemorySessionStore, SessionStorage
+from oidc_auth.types import OIDCSettings, freeze_settings
+
+# Share sessions through Redis when OIDC_REDIS_URL is set; otherwise use the
+# default in-memory session store, bounded to OIDC_MAX_SESSIONS entries
+session_store: Union[SessionStorage, AsyncSessionStorage]
+if os.environ.get("OIDC_REDIS_URL"):
+    from oidc_auth.redis_store import RedisSessionStore
+
+    session_store = RedisSessionStore(os.environ["OIDC_REDIS_URL"])
+else:
+    session_store = InMemorySessionStore(maxsize=int(os.environ.get("OIDC_MAX_SESSIONS", "10000")))
 
-# Use the default in-memory session store
-session_store = InMemorySessionStore()
+# Load OIDC Configuration using Pydantic BaseSettings, then freeze it into a
+# slotted dataclass for the controller's hot paths
+settings = freeze_settings(OIDCSettings())
 
-# Load OIDC Configuration using Pydantic BaseSettings
-settings = OIDCSettings()
+# Initialize OIDCController
+oidc_controller = OIDCController(config=settings, session_store=session_store)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Releases the controller's and session store's pooled connections on shutdown.
+    """
+    yield
+    await oidc_controller.aclose()
+    if isinstance(session_store, AsyncSessionStorage):
+        await session_store.aclose()
 
 app = FastAPI(
     title="FastAPI OIDC Example",
     description="A demonstration of OIDC authentication with FastAPI using oidc-auth middleware.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Initialize OIDCController
-oidc_controller = OIDCController(config=settings, session_store=session_store)
-
 # Add OIDCAuthMiddleware to the FastAPI application
-# Public paths are those that do not require authentication
+# Public paths are those that do not require authentication. They are matched
+# exactly, so "/" does not make every path public.
 app.add_middleware(
     OIDCAuthMiddleware,
     controller=oidc_controller,
-    public_paths=["/", "/public", "/login", "/oidc/callback", "/oidc/logout"]
+    public_paths_regex=re.compile(r"^(/|/public|/login|/oidc/callback|/oidc/logout)$"),
 )
 
+# Static pages are encoded once at import time. A fresh response object still
+# wraps them per request, since FastAPI attaches per-request state to it.
+_ANONYMOUS_ROOT_BODY = b"""
+<html>
+    <head>
+        <title>Welcome</title>
+    </head>
+    <body>
+        <h1>Welcome!</h1>
+        <p>You are not logged in.</p>
+        <p><a href="/login">Login with OIDC</a></p>
+        <p><a href="/public">Go to public content</a></p>
+    </body>
+</html>
+"""
+
+_PUBLIC_BODY = b"""
+<html>
+    <head>
+        <title>Public Content</title>
+    </head>
+    <body>
+        <h1>Public Content</h1>
+        <p>This content is accessible to everyone.</p>
+        <p><a href="/">Go to home</a></p>
+    </body>
+</html>
+"""
+
+# Pages showing the user's email are rendered from precompiled templates; the
+# email comes from the IdP and is HTML-escaped before substitution.
+_ROOT_TEMPLATE = string.Template("""
+<html>
+    <head>
+        <title>Welcome</title>
+    </head>
+    <body>
+        <h1>Welcome, $email!</h1>
+        <p>This is a protected page. You are logged in.</p>
+        <p><a href="/protected">Go to protected content</a></p>
+        <p><a href="/api/downstream">Call Downstream API (Token Exchange)</a></p>
+        <p><a href="/oidc/logout">Logout</a></p>
+        <p><a href="/public">Go to public content</a></p>
+    </body>
+</html>
+""")
+
+_PROTECTED_TEMPLATE = string.Template("""
+<html>
+    <head>
+        <title>Protected Content</title>
+    </head>
+    <body>
+        <h1>Protected Content for $email</h1>
+        <p>This content is only visible if you are authenticated.</p>
+        <p><a href="/">Go to home</a></p>
+        <p><a href="/oidc/logout">Logout</a></p>
+    </body>
+</html>
+""")
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """
@@ -47,34 +135,8 @@ async def read_root(request: Request):
     user_info = request.state.user
     if user_info:
         email = user_info.get("email", "N/A")
-        return f"""
-        <html>
-            <head>
-                <title>Welcome</title>
-            </head>
-            <body>
-                <h1>Welcome, {email}!</h1>
-                <p>This is a protected page. You are logged in.</p>
-                <p><a href="/protected">Go to protected content</a></p>
-                <p><a href="/api/downstream">Call Downstream API (Token Exchange)</a></p>
-                <p><a href="/oidc/logout">Logout</a></p>
-                <p><a href="/public">Go to public content</a></p>
-            </body>
-        </html>
-        """
-    return """
-    <html>
-        <head>
-            <title>Welcome</title>
-        </head>
-        <body>
-            <h1>Welcome!</h1>
-            <p>You are not logged in.</p>
-            <p><a href="/login">Login with OIDC</a></p>
-            <p><a href="/public">Go to public content</a></p>
-        </body>
-    </html>
-    """
+        return HTMLResponse(_ROOT_TEMPLATE.substitute(email=html.escape(email)))
+    return HTMLResponse(_ANONYMOUS_ROOT_BODY)
 
 @app.get("/protected", response_class=HTMLResponse)
 async def protected_route(request: Request):
@@ -84,19 +146,7 @@ async def protected_route(request: Request):
     user_info = request.state.user
     if user_info:
         email = user_info.get("email", "N/A")
-        return f"""
-        <html>
-            <head>
-                <title>Protected Content</title>
-            </head>
-            <body>
-                <h1>Protected Content for {email}</h1>
-                <p>This content is only visible if you are authenticated.</p>
-                <p><a href="/">Go to home</a></p>
-                <p><a href="/oidc/logout">Logout</a></p>
-            </body>
-        </html>
-        """
+        return HTMLResponse(_PROTECTED_TEMPLATE.substitute(email=html.escape(email)))
     return RedirectResponse(url="/login") # Should ideally not be reached due to middleware protection
 
 @app.get("/public", response_class=HTMLResponse)
@@ -104,18 +154,7 @@ async def public_route():
     """
     A public endpoint. Accessible to all users, authenticated or not.
     """
-    return """
-    <html>
-        <head>
-            <title>Public Content</title>
-        </head>
-        <body>
-            <h1>Public Content</h1>
-            <p>This content is accessible to everyone.</p>
-            <p><a href="/">Go to home</a></p>
-        </body>
-    </html>
-    """
+    return HTMLResponse(_PUBLIC_BODY)
 
 # Example of a protected API endpoint
 @app.get("/api/data")
@@ -125,7 +164,7 @@ async def get_api_data(request: Request):
     """
     if request.state.user:
         return {"message": "This is sensitive API data", "user": request.state.user}
-    # The middleware should handle unauthorized access with a 401 JSONResponse
+    # The middleware should handle unauthorized access with a 401 JSON response
     return {"message": "You should not see this if unauthenticated"}
 
 @app.get("/api/downstream")
@@ -1,4 +1,5 @@
 from typing import Optional, List, Dict
+import re
 
 from fastapi import Request, HTTPException
 from fastapi.responses import RedirectResponse, JSONResponse
@@ -31,8 +32,16 @@ class OIDCAuthMiddleware(BaseHTTPMiddleware):
         controller (OIDCController): An instance of OIDCController to handle OIDC logic.
         public_paths (List[str]): A list of URL path prefixes that should be publicly
                                   accessible without authentication.
+        public_paths_regex (Optional[re.Pattern[str]]): A compiled pattern; paths it
+                                                     matches are publicly accessible.
     """
-    def __init__(self, app, controller: OIDCController, public_paths: List[str] = None):
+    def __init__(
+        self,
+        app,
+        controller: OIDCController,
+        public_paths: List[str] = None,
+        public_paths_regex: Optional[re.Pattern[str]] = None,
+    ):
         """
         Initializes the OIDCAuthMiddleware.
 
@@ -43,10 +52,22 @@ class OIDCAuthMiddleware(BaseHTTPMiddleware):
             public_paths (List[str], optional): A list of URL path prefixes that
                                                 should be accessible without authentication.
                                                 Defaults to an empty list.
+            public_paths_regex (re.Pattern[str], optional): A precompiled pattern matched
+                                                         (with `re.match`) against the
+                                                         request path; matching paths are
+                                                         accessible without authentication.
         """
         super().__init__(app)
         self.controller = controller
         self.public_paths = public_paths or []
+        self.public_paths_regex = public_paths_regex
+        # Prefixes are folded into one alternation so each request costs a single
+        # C-level match instead of a Python loop over `startswith`.
+        self._public_prefixes: Optional[re.Pattern[str]] = (
+            re.compile("|".join(re.escape(p) for p in self.public_paths))
+            if self.public_paths
+            else None
+        )
 
     async def dispatch(self, request: Request, call_next):
         """
@@ -57,7 +78,8 @@ class OIDCAuthMiddleware(BaseHTTPMiddleware):
         2. Intercepts OIDC-specific routes ("/login", "/oidc/callback", "/oidc/logout")
            and delegates their handling to the `OIDCController`.
         3. Applies protection logic:
-           - Allows requests for `public_paths` to proceed without authentication.
+           - Allows requests for `public_paths` or paths matching `public_paths_regex`
+             to proceed without authentication.
            - Redirects unauthenticated users from protected web routes to "/login".
            - Returns a 401 Unauthorized JSON response for unauthenticated access
              to protected API routes (those starting with "/api").
@@ -77,8 +99,9 @@ class OIDCAuthMiddleware(BaseHTTPMiddleware):
         session_id = request.cookies.get("session_id")
         request.state.user = None
         
-        if session_id and session_id in self.controller.session_store:
-            request.state.user = self.controller.session_store[session_id].get("user")
+        session = await self.controller.get_session(session_id) if session_id else None
+        if session is not None:
+            request.state.user = session.user
 
         # 2. Handle OIDC Routes via Controller
         path = request.url.path
@@ -90,7 +113,9 @@ class OIDCAuthMiddleware(BaseHTTPMiddleware):
             return await self.controller.logout(request)
 
         # 3. Protection Logic
-        if any(path.startswith(p) for p in self.public_paths):
+        if (self.public_paths_regex is not None and self.public_paths_regex.match(path)) or (
+            self._public_prefixes is not None and self._public_prefixes.match(path)
+        ):
             return await call_next(request)
 
         if not request.state.user:
@@ -0,0 +1,104 @@
+"""
+Redis Session Storage
+
+This module provides a Redis-backed implementation of `AsyncSessionStorage`,
+allowing sessions to be shared between workers and replicas without sticky
+sessions. It requires the optional `redis` dependency
+(`pip install oidc-auth[redis]`).
+
+Sessions are serialized with orjson and expire after a sliding TTL that is
+renewed whenever they are read.
+"""
+
+import dataclasses
+from typing import Optional
+
+import orjson
+from redis.asyncio import ConnectionPool, Redis
+
+from oidc_auth.session import AsyncSessionStorage
+from oidc_auth.types import StoredSession
+
+
+class RedisSessionStore(AsyncSessionStorage):
+    """
+    A session storage implementation backed by Redis.
+
+    Attributes:
+        ttl (int): The session lifetime in seconds, renewed on every read.
+        prefix (str): The prefix prepended to session IDs to form Redis keys.
+    """
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 50,
+        ttl: int = 86_400,
+        prefix: str = "oidc:session:",
+    ):
+        """
+        Initializes the Redis session store.
+
+        Args:
+            url (str): The Redis connection URL (e.g., 'redis://localhost:6379/0').
+            pool_size (int): The maximum number of pooled connections. Defaults to 50.
+            ttl (int): The session lifetime in seconds. Defaults to one day.
+            prefix (str): The prefix for session keys. Defaults to 'oidc:session:'.
+        """
+        self._redis = Redis.from_pool(ConnectionPool.from_url(url, max_connections=pool_size))
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[StoredSession]:
+        """
+        Returns the session stored under `key` and renews its expiry.
+
+        Args:
+            key (str): The session ID.
+
+        Returns:
+            Optional[StoredSession]: The session, or None if it does not exist.
+        """
+        # Reading the session and sliding its expiry share one round trip.
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(self.prefix + key)
+            pipe.expire(self.prefix + key, self.ttl)
+            raw, _ = await pipe.execute()
+        if raw is None:
+            return None
+        return StoredSession(**orjson.loads(raw))
+
+    async def set(self, key: str, value: StoredSession) -> None:
+        """
+        Stores a session under `key` with a fresh expiry.
+
+        Args:
+            key (str): The session ID.
+            value (StoredSession): The session to store.
+        """
+        await self._redis.set(
+            self.prefix + key, orjson.dumps(dataclasses.asdict(value)), ex=self.ttl
+        )
+
+    async def pop(self, key: str) -> Optional[StoredSession]:
+        """
+        Removes and returns the session stored under `key`.
+
+        Args:
+            key (str): The session ID.
+
+        Returns:
+            Optional[StoredSession]: The removed session, or None if it did not exist.
+        """
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.get(self.prefix + key)
+            pipe.delete(self.prefix + key)
+            raw, _ = await pipe.execute()
+        if raw is None:
+            return None
+        return StoredSession(**orjson.loads(raw))
+
+    async def aclose(self) -> None:
+        """
+        Closes the connection pool. Should be called on application shutdown.
+        """
+        await self._redis.aclose()
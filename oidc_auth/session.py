@@ -5,11 +5,20 @@ This module defines the abstract interface (Protocol) for session management.
 It ensures that any session storage implementation adheres to a common
 dictionary-like contract, allowing for flexible and swappable session
 persistence mechanisms (e.g., in-memory, Redis, Memcached).
+
+Backends that can only be reached asynchronously (e.g., `redis.asyncio`)
+implement `AsyncSessionStorage` instead, so the event loop is never blocked
+on session I/O.
 """
 
-from typing import Protocol, Dict, Any, MutableMapping
+from abc import ABC, abstractmethod
+from typing import Iterator, MutableMapping, Optional
+
+from cachetools import TTLCache
 
-class SessionStorage(Protocol, MutableMapping[str, Dict[str, Any]]):
+from oidc_auth.types import StoredSession
+
+class SessionStorage(MutableMapping[str, StoredSession]):
     """
     Abstract base class defining the interface for session storage.
 
@@ -17,30 +26,78 @@ class SessionStorage(Protocol, MutableMapping[str, Dict[str, Any]]):
     for storing and retrieving session data. This allows the OIDC middleware
     to interact with various session backends in a consistent manner.
 
-    The session data for a given session ID should be a dictionary
-    (Dict[str, Any]).
+    The session data for a given session ID is a `StoredSession`.
     """
-    def __getitem__(self, key: str) -> Dict[str, Any]:
+    @abstractmethod
+    def __getitem__(self, key: str) -> StoredSession:
         ...
 
-    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+    @abstractmethod
+    def __setitem__(self, key: str, value: StoredSession) -> None:
         ...
 
+    @abstractmethod
     def __delitem__(self, key: str) -> None:
         ...
 
+    @abstractmethod
     def __len__(self) -> int:
         ...
 
-    def __iter__(self) -> 'Iterator[str]': # type: ignore
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        ...
+
+class AsyncSessionStorage(ABC):
+    """
+    Abstract base class defining the interface for asynchronous session storage.
+
+    This mirrors the subset of the dictionary interface the OIDC controller
+    uses, with awaitable methods, for backends that perform network I/O.
+    """
+    @abstractmethod
+    async def get(self, key: str) -> Optional[StoredSession]:
+        """
+        Returns the session stored under `key`, or None if there is none.
+        """
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: StoredSession) -> None:
+        """
+        Stores `value` under `key`, replacing any existing session.
+        """
         ...
 
-class InMemorySessionStore(dict, SessionStorage):
+    @abstractmethod
+    async def pop(self, key: str) -> Optional[StoredSession]:
+        """
+        Removes and returns the session stored under `key`, or None if there is none.
+        """
+        ...
+
+    async def aclose(self) -> None:
+        """
+        Releases any connections held by the backend. Does nothing by default.
+        """
+
+class InMemorySessionStore(TTLCache, SessionStorage):
     """
     A default in-memory session storage implementation.
 
-    This class inherits from `dict`, providing a simple, dictionary-like
-    backend for storing session data. It is suitable for single-process
-    applications and development environments.
+    This class inherits from `cachetools.TTLCache`, providing a bounded,
+    dictionary-like backend for storing session data. Sessions expire after
+    `ttl` seconds and the least recently used ones are evicted once `maxsize`
+    is reached, so abandoned sessions do not accumulate. It is suitable for
+    single-process applications and development environments.
     """
-    pass
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400):
+        """
+        Initializes the in-memory session store.
+
+        Args:
+            maxsize (int): The maximum number of sessions kept at once.
+                           Defaults to 10,000.
+            ttl (float): The lifetime of a session in seconds. Defaults to one day.
+        """
+        super().__init__(maxsize, ttl)
@@ -7,9 +7,11 @@ to load values from environment variables or provide sensible defaults.
 It also includes type definitions for session data.
 """
 
+from dataclasses import dataclass
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Dict, Any, Literal
+from typing import Dict, Any, Literal, Optional
 
 class OIDCSettings(BaseSettings):
     """
@@ -26,11 +28,65 @@ class OIDCSettings(BaseSettings):
     AUTHORIZE_URL: str = Field(..., description="The OIDC authorization endpoint URL.")
     TOKEN_URL: str = Field(..., description="The OIDC token endpoint URL.")
     USERINFO_URL: str = Field(..., description="The OIDC user info endpoint URL.")
+    JWKS_URL: Optional[str] = Field(None, description="The IdP's JWKS endpoint URL. Defaults to the 'jwks_uri' advertised by the issuer's discovery document.")
     REDIRECT_URI: str = Field("http://localhost:8000/oidc/callback", description="The callback URL registered with the IdP.")
     SCOPE: str = Field("openid email profile", description="The OIDC scopes requested during authorization.")
     COOKIE_SECURE: bool = Field(False, description="Whether the session cookie should be marked as 'Secure'. Set to True for HTTPS environments.")
     COOKIE_SAMESITE: Literal["lax", "strict", "none"] = Field("lax", description="The SameSite attribute for the session cookie.")
 
 
-# Example of session data type
-SessionData = Dict[str, Any]
+@dataclass(frozen=True, slots=True)
+class FrozenOIDCSettings:
+    """
+    An immutable, slotted snapshot of `OIDCSettings`.
+
+    Settings are loaded once at startup, so the controller can read them as
+    plain slot attributes instead of going through the pydantic model on every
+    request. The fields mirror `OIDCSettings` and must be kept in sync with it.
+    """
+    CLIENT_ID: str
+    CLIENT_SECRET: str
+    ISSUER_URL: str
+    AUTHORIZE_URL: str
+    TOKEN_URL: str
+    USERINFO_URL: str
+    JWKS_URL: Optional[str]
+    REDIRECT_URI: str
+    SCOPE: str
+    COOKIE_SECURE: bool
+    COOKIE_SAMESITE: Literal["lax", "strict", "none"]
+
+
+def freeze_settings(settings: OIDCSettings) -> FrozenOIDCSettings:
+    """
+    Snapshots loaded settings into an immutable `FrozenOIDCSettings`.
+
+    Args:
+        settings (OIDCSettings): The validated settings to snapshot.
+
+    Returns:
+        FrozenOIDCSettings: A frozen dataclass with the same field values.
+    """
+    return FrozenOIDCSettings(**settings.model_dump())
+
+
+@dataclass(slots=True)
+class StoredSession:
+    """
+    The data kept in the session store for an authenticated user.
+
+    Attributes:
+        user (Dict[str, Any]): The user's claims (id_token or userinfo).
+        access_token (str): The access token issued by the IdP.
+        refresh_token (Optional[str]): The refresh token, if one was issued.
+        id_token (Optional[str]): The raw id_token returned at login.
+        sid (Optional[str]): The IdP session ID (or subject) the user info is cached under.
+        expires_at (Optional[float]): The access token's expiry as a Unix timestamp,
+                                      if the IdP reported one.
+    """
+    user: Dict[str, Any]
+    access_token: str
+    refresh_token: Optional[str] = None
+    id_token: Optional[str] = None
+    sid: Optional[str] = None
+    expires_at: Optional[float] = None